@@ -1,5 +1,8 @@
 # downloader.py
-import os, re, uuid, threading, time, shutil
+import errno, functools, os, re, subprocess, uuid, threading, time, shutil
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, fields
 from typing import Dict, Optional, List
 from yt_dlp import YoutubeDL
 from yt_dlp.utils import DownloadError
@@ -13,11 +16,139 @@ STORAGE_DIR = os.path.join(BASE_DIR, "storage")
 COOKIES_DIR = os.path.join(BASE_DIR, "cookies")
 COOKIES_FILE = os.path.join(COOKIES_DIR, "cookies.txt")
 
+# --------------------- Job model ---------------------
+
+@dataclass(slots=True)
+class Job:
+    """
+    One download job. Mutated from several threads (worker, progress hooks,
+    cancel endpoint, SSE readers), so multi-field updates go through _lock
+    and the API reads a consistent snapshot() instead of the live object.
+    """
+    jobId: str
+    url: str
+    mediaType: str                        # 'video' | 'audio'
+    videoHeight: Optional[int]            # int | None
+    audioBitrate: str
+    selectedUrls: List[str]
+    rootDir: str                          # chosen bucket (Videos or Audios by default)
+    concurrency: int
+    finalDir: Optional[str] = None
+    status: str = "queued"
+    progress: float = 0.0
+    percent: str = "0%"
+    eta: str = ""
+    speed: str = ""
+    message: str = ""
+    kind: Optional[str] = None
+    title: str = ""
+    currentItem: int = 0
+    totalItems: int = 0
+    currentTitle: str = ""
+    created: int = field(default_factory=lambda: int(time.time()))
+    _cancel: bool = False
+    _version: int = 0                     # bumped on every change; lets SSE skip dumps
+    _lastHookTs: float = 0.0              # progress-hook throttle timestamp
+    _probe: Optional[Dict] = None         # cached probe_url_meta result, if any
+    _lock: threading.RLock = field(default_factory=threading.RLock)
+    _event: threading.Event = field(default_factory=threading.Event)
+
+    def snapshot(self) -> Dict:
+        """Consistent public view of the job — what the API serializes."""
+        with self._lock:
+            return {name: getattr(self, name) for name in _JOB_PUBLIC_FIELDS}
+
+    def notify(self):
+        """Bump the change counter and wake any SSE stream waiting on this job."""
+        with self._lock:
+            self._version += 1
+        self._event.set()
+
+    @property
+    def version(self) -> int:
+        """Cheap change counter — compare before paying for snapshot/dumps."""
+        return self._version
+
+    def wait_update(self, timeout: float) -> bool:
+        """Block until notify() or timeout; True if something changed."""
+        changed = self._event.wait(timeout)
+        self._event.clear()
+        return changed
+
+_JOB_PUBLIC_FIELDS = tuple(f.name for f in fields(Job) if not f.name.startswith("_"))
+
+class _JobRegistry:
+    """
+    OrderedDict-backed job store, bounded so finished jobs can't grow memory
+    forever. Keeps the dict-style interface the rest of the code uses; only
+    terminal jobs (done/error/canceled) are ever evicted.
+    """
+    MAX_JOBS = 256
+    _TERMINAL = ("done", "error", "canceled")
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __setitem__(self, job_id: str, job: Job):
+        with self._lock:
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+            if len(self._jobs) > self.MAX_JOBS:
+                for jid, j in list(self._jobs.items()):
+                    if len(self._jobs) <= self.MAX_JOBS:
+                        break
+                    if j.status in self._TERMINAL:
+                        del self._jobs[jid]
+
+    def __getitem__(self, job_id: str) -> Job:
+        with self._lock:
+            return self._jobs[job_id]
+
+    def get(self, job_id: str, default=None):
+        with self._lock:
+            return self._jobs.get(job_id, default)
+
+    def pop(self, job_id: str, default=None):
+        with self._lock:
+            return self._jobs.pop(job_id, default)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def sweep(self, max_age: float = 3600.0):
+        """Drop terminal jobs older than max_age seconds."""
+        cutoff = time.time() - max_age
+        with self._lock:
+            stale = [jid for jid, j in self._jobs.items()
+                     if j.status in self._TERMINAL and j.created < cutoff]
+            for jid in stale:
+                del self._jobs[jid]
+
 # In-memory job registry (single-process only)
-JOBS: Dict[str, Dict] = {}
+JOBS = _JobRegistry()
+
+_SWEEPER_STARTED = threading.Event()
+
+def start_job_sweeper(interval: float = 300.0):
+    """Start the background thread that evicts stale terminal jobs.
+    Idempotent — safe to call from every worker/import path."""
+    if _SWEEPER_STARTED.is_set():
+        return
+    _SWEEPER_STARTED.set()
+    def _sweep_loop():
+        while True:
+            time.sleep(interval)
+            JOBS.sweep()
+    threading.Thread(target=_sweep_loop, daemon=True).start()
 
 # --------------------- Paths & Defaults ---------------------
 
+# All of this used to run at import time (an os.makedirs per bucket, in
+# every worker process); it's now deferred to the first job and memoized.
+
+@functools.lru_cache(maxsize=1)
 def user_downloads_dir() -> str:
     dl = os.path.join(os.path.expanduser("~"), "Downloads")
     try:
@@ -27,25 +158,36 @@ def user_downloads_dir() -> str:
         os.makedirs(dl, exist_ok=True)
     return dl
 
-DEFAULT_DL = user_downloads_dir()
-DEFAULT_VID_BUCKET = os.path.join(DEFAULT_DL, "Yt_videos")
-DEFAULT_AUD_BUCKET = os.path.join(DEFAULT_DL, "Yt_audios")
+def _default_bucket(media_type: str) -> str:
+    name = "Yt_videos" if media_type == "video" else "Yt_audios"
+    return os.path.join(user_downloads_dir(), name)
 
 def ensure_default_buckets():
-    for p in (DEFAULT_VID_BUCKET, DEFAULT_AUD_BUCKET, STORAGE_DIR, COOKIES_DIR):
+    for p in (_default_bucket("video"), _default_bucket("audio"), STORAGE_DIR, COOKIES_DIR):
         try:
             os.makedirs(p, exist_ok=True)
         except Exception:
             pass
 
-ensure_default_buckets()
+_BUCKETS_READY = False
+_BUCKETS_LOCK = threading.Lock()
+
+def _ensure_buckets_once():
+    global _BUCKETS_READY
+    if _BUCKETS_READY:
+        return
+    with _BUCKETS_LOCK:
+        if not _BUCKETS_READY:
+            ensure_default_buckets()
+            _BUCKETS_READY = True
 
 def _resolve_root_dir(user_dir: Optional[str], media_type: str) -> str:
+    _ensure_buckets_once()
     if user_dir:
         user_dir = os.path.expanduser(user_dir)
         root = user_dir if os.path.isabs(user_dir) else os.path.join(STORAGE_DIR, user_dir)
     else:
-        root = DEFAULT_VID_BUCKET if media_type == "video" else DEFAULT_AUD_BUCKET
+        root = _default_bucket(media_type)
     try:
         os.makedirs(root, exist_ok=True)
     except Exception:
@@ -55,25 +197,28 @@ def _resolve_root_dir(user_dir: Optional[str], media_type: str) -> str:
 
 # --------------------- Helpers ---------------------
 
+# Compiled once — these run against every filename / progress line
+_SAFE_FOLDER_RE = re.compile(r'[\\/:*?"<>|]+')
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+_UNITS = ("B", "KiB", "MiB", "GiB", "TiB")
+
 def safe_folder(name: str) -> str:
-    return re.sub(r'[\\/:*?"<>|]+', "_", name).strip() or "Untitled"
+    return _SAFE_FOLDER_RE.sub("_", name).strip() or "Untitled"
 
 def _list_heights_from_info(info: Dict) -> List[int]:
-    heights = set()
-    for f in (info or {}).get("formats", []):
-        vcodec = f.get("vcodec")
-        h = f.get("height")
-        if vcodec and vcodec != "none" and isinstance(h, int):
-            heights.add(h)
+    _isinstance = isinstance  # local binding: this runs over every format dict
+    heights = {
+        f.get("height")
+        for f in (info or {}).get("formats", [])
+        if f.get("vcodec") not in (None, "", "none") and _isinstance(f.get("height"), int)
+    }
     return sorted(heights, reverse=True)
 
 def strip_ansi(s: Optional[str]) -> str:
-    if not s:
-        return ""
-    return re.sub(r"\x1b\[[0-9;]*m", "", s)
+    return _ANSI_RE.sub("", s) if s else ""
 
 def humanize_bytes(n: float) -> str:
-    for unit in ["B", "KiB", "MiB", "GiB", "TiB"]:
+    for unit in _UNITS:
         if n < 1024.0 or unit == "TiB":
             return f"{n:.2f} {unit}"
         n /= 1024.0
@@ -81,10 +226,18 @@ def humanize_bytes(n: float) -> str:
 
 def humanize_bps(v: Optional[float], fallback: Optional[str]) -> str:
     if isinstance(v, (int, float)) and v > 0:
-        return f"{humanize_bytes(float(v))}/s"
+        if v < 10240:
+            return f"{humanize_bytes(float(v))}/s"
+        # Bucket to 10 KiB/s steps: consecutive hook calls land in the same
+        # bucket >90% of the time, so the formatted string is a cache hit.
+        return _humanize_bps_bucket(int(v) // 10240)
     fs = strip_ansi(fallback)
     return fs
 
+@functools.lru_cache(maxsize=1024)
+def _humanize_bps_bucket(bucket: int) -> str:
+    return f"{humanize_bytes(float(bucket * 10240))}/s"
+
 def humanize_seconds(sec: Optional[float]) -> str:
     if sec is None:
         return ""
@@ -92,6 +245,10 @@ def humanize_seconds(sec: Optional[float]) -> str:
         s = int(max(0, sec))
     except Exception:
         return strip_ansi(str(sec))
+    return _humanize_seconds_int(s)
+
+@functools.lru_cache(maxsize=1024)
+def _humanize_seconds_int(s: int) -> str:
     h = s // 3600
     m = (s % 3600) // 60
     ss = s % 60
@@ -121,50 +278,116 @@ def _yt_opts(base: Dict) -> Dict:
         "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
                        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"),
         "Accept-Language": "en-US,en;q=0.9",
+        # Persistent connections matter here: every playlist item hits the
+        # same CDN hosts, so don't pay TCP+TLS setup per request. Don't set
+        # Accept-Encoding though — yt-dlp advertises exactly the codings it
+        # can decode, and overriding it can force undecodable responses.
+        "Connection": "keep-alive",
     })
     return opts
 
+# Optional: aria2c does parallel segmented downloads with keep-alive.
+# Used for the actual media fetch when installed; silently skipped otherwise.
+_ARIA2C = shutil.which("aria2c")
+_ARIA2C_ARGS = ["-x", "4", "-k", "1M", "--enable-keep-alive=true", "--file-allocation=none"]
+
 # --------------------- Probe ---------------------
 
+# Probe results keyed by URL so the worker doesn't redo the extract the UI
+# just did via /api/probe. Entries are (timestamp, meta).
+_PROBE_CACHE: Dict[str, tuple] = {}
+_PROBE_CACHE_LOCK = threading.Lock()
+_PROBE_CACHE_TTL = 60  # seconds
+
+# Heights keyed by URL — users typically probe, then download the same URL.
+# Entries are (timestamp, heights), LRU-bounded and expiring like the probe
+# cache. Failures aren't cached, so a transient network error on one probe
+# doesn't pin an empty quality list on that URL until restart.
+_HEIGHTS_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+_HEIGHTS_CACHE_LOCK = threading.Lock()
+_HEIGHTS_CACHE_MAX = 256
+
 def _probe_video_heights(url: str) -> List[int]:
+    with _HEIGHTS_CACHE_LOCK:
+        cached = _HEIGHTS_CACHE.get(url)
+        if cached and time.time() - cached[0] < _PROBE_CACHE_TTL:
+            _HEIGHTS_CACHE.move_to_end(url)
+            return cached[1]
     try:
         with YoutubeDL(_yt_opts({"skip_download": True})) as ydl:
             vi = ydl.extract_info(url, download=False)
-        return _list_heights_from_info(vi)
+        heights = _list_heights_from_info(vi)
     except Exception:
         return []
+    if heights:
+        with _HEIGHTS_CACHE_LOCK:
+            _HEIGHTS_CACHE[url] = (time.time(), heights)
+            _HEIGHTS_CACHE.move_to_end(url)
+            while len(_HEIGHTS_CACHE) > _HEIGHTS_CACHE_MAX:
+                _HEIGHTS_CACHE.popitem(last=False)
+    return heights
+
+def _video_meta_from_info(info: Dict, url: str) -> Dict:
+    """Build the single-video probe payload from a fully processed info dict."""
+    heights = _list_heights_from_info(info) or _probe_video_heights(info.get("webpage_url") or url)
+    return {
+        "kind": "video",
+        "title": info.get("title") or "Untitled",
+        "availableHeights": heights,
+        "defaultHeight": heights[0] if heights else None,
+        "canAudio": True,
+        "thumbnail": info.get("thumbnail"),
+    }
 
 def probe_url_meta(url: str) -> Dict:
     """
     Fast probe (works for unlisted when cookies.txt present).
     - Playlists: extract_flat='in_playlist' (fast, no per-item resolves).
     - Singles: read formats for available heights.
+    Results are cached briefly so probe-then-download hits the network once.
     """
+    with _PROBE_CACHE_LOCK:
+        cached = _PROBE_CACHE.get(url)
+        if cached and time.time() - cached[0] < _PROBE_CACHE_TTL:
+            return cached[1]
     try:
+        # Phase 1: raw extract (process=False) — learns the kind without
+        # resolving formats or playlist entries.
         with YoutubeDL(_yt_opts({
             "skip_download": True,
-            "extract_flat": "in_playlist",
             "ignoreerrors": True,
         })) as ydl:
-            info = ydl.extract_info(url, download=False)
+            raw = ydl.extract_info(url, download=False, process=False)
+            if raw is None:
+                raise DownloadError("Video or playlist unavailable")
+            if raw.get("_type") == "playlist" or raw.get("entries") is not None:
+                kind = "playlist"
+                # Phase 2 (playlists only): flat extract gets entry titles
+                # and ids without resolving each item.
+                with YoutubeDL(_yt_opts({
+                    "skip_download": True,
+                    "extract_flat": "in_playlist",
+                    "ignoreerrors": True,
+                })) as flat_ydl:
+                    info = flat_ydl.extract_info(url, download=False)
+            else:
+                kind = "video"
+                # Single video: finish processing the result we already have.
+                # No second network call, and `formats` comes out populated —
+                # the old flat extract left it empty, so the heights probe
+                # re-fetched the page on almost every video probe.
+                info = ydl.process_ie_result(raw, download=False)
     except DownloadError as e:
         raise DownloadError("Video or playlist unavailable") from e
 
-    kind = "playlist" if ("entries" in info and info.get("entries")) else "video"
     title = info.get("title") or "Untitled"
     thumb = info.get("thumbnail")
 
     if kind == "video":
-        heights = _list_heights_from_info(info) or _probe_video_heights(info.get("webpage_url") or url)
-        default_h = heights[0] if heights else None
-        return {
-            "kind": "video",
-            "title": title,
-            "availableHeights": heights,
-            "defaultHeight": default_h,
-            "canAudio": True,
-            "thumbnail": thumb,
-        }
+        meta = _video_meta_from_info(info, url)
+        with _PROBE_CACHE_LOCK:
+            _PROBE_CACHE[url] = (time.time(), meta)
+        return meta
 
     # playlist
     entries = []
@@ -185,9 +408,16 @@ def probe_url_meta(url: str) -> Dict:
 
     heights: List[int] = []
     if entries:
-        heights = _probe_video_heights(entries[0]["url"])
+        # Union heights across the first few items in parallel — a single
+        # item can be missing resolutions the rest of the playlist has.
+        probe_urls = [e["url"] for e in entries[:4] if e.get("url")]
+        merged = set()
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            for fut in as_completed([ex.submit(_probe_video_heights, u) for u in probe_urls]):
+                merged.update(fut.result())
+        heights = sorted(merged, reverse=True)
     default_h = heights[0] if heights else None
-    return {
+    meta = {
         "kind": "playlist",
         "title": title,
         "availableHeights": heights,
@@ -196,6 +426,80 @@ def probe_url_meta(url: str) -> Dict:
         "thumbnail": thumb,
         "entries": entries,
     }
+    with _PROBE_CACHE_LOCK:
+        _PROBE_CACHE[url] = (time.time(), meta)
+    return meta
+
+def probe_url_meta_stream(url: str):
+    """
+    Streaming variant of probe_url_meta for big playlists: yields
+    (event, payload) tuples — 'meta' with title/thumbnail first, then one
+    'entry' per item, then 'done' with the full meta dict. Works on the raw
+    (process=False) extract: its `entries` is the extractor's own lazy
+    generator, so iterating it drives the paged playlist fetches and rows
+    go out as each page arrives instead of after the full resolve.
+    Single videos yield 'meta' then 'done' from the same single round trip.
+    """
+    entries: List[Dict] = []
+    with YoutubeDL(_yt_opts({
+        "skip_download": True,
+        "ignoreerrors": True,
+    })) as ydl:
+        raw = ydl.extract_info(url, download=False, process=False)
+        if raw is None:
+            raise DownloadError("Video or playlist unavailable")
+
+        if raw.get("_type") != "playlist" and raw.get("entries") is None:
+            # Single video: finish processing the result we already have —
+            # the same one-round-trip path probe_url_meta takes.
+            info = ydl.process_ie_result(raw, download=False)
+            meta = _video_meta_from_info(info, url)
+            with _PROBE_CACHE_LOCK:
+                _PROBE_CACHE[url] = (time.time(), meta)
+            yield ("meta", meta)
+            yield ("done", meta)
+            return
+
+        title = raw.get("title") or "Untitled"
+        thumb = raw.get("thumbnail")
+        yield ("meta", {"kind": "playlist", "title": title,
+                        "thumbnail": thumb, "canAudio": True})
+
+        for i, e in enumerate(raw.get("entries") or [], start=1):
+            if not e:
+                continue
+            entry = {
+                "index": i,
+                "id": e.get("id") or "",
+                "title": e.get("title") or f"Item {i}",
+                "url": e.get("url") or e.get("webpage_url"),
+                "duration": e.get("duration") or e.get("duration_string"),
+                "thumbnail": None,
+            }
+            entries.append(entry)
+            yield ("entry", entry)
+
+    heights: List[int] = []
+    if entries:
+        probe_urls = [e["url"] for e in entries[:4] if e.get("url")]
+        merged = set()
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            for fut in as_completed([ex.submit(_probe_video_heights, u) for u in probe_urls]):
+                merged.update(fut.result())
+        heights = sorted(merged, reverse=True)
+    meta = {
+        "kind": "playlist",
+        "title": title,
+        "availableHeights": heights,
+        "defaultHeight": heights[0] if heights else None,
+        "canAudio": True,
+        "thumbnail": thumb,
+        "entries": entries,
+    }
+    # Prime the probe cache so the follow-up job creation skips the network
+    with _PROBE_CACHE_LOCK:
+        _PROBE_CACHE[url] = (time.time(), meta)
+    yield ("done", meta)
 
 # --------------------- Download engine ---------------------
 
@@ -213,86 +517,153 @@ def _progress_hook(job_id: str):
             return
         status = d.get("status")
         if status == "downloading":
-            job["status"] = "running"
+            # yt-dlp fires this dozens of times per second; most updates are
+            # invisible to the UI anyway, so throttle the formatting work to
+            # ~4 Hz. Cancellation and 'finished' are always handled below.
+            now = time.monotonic()
+            if now - job._lastHookTs < 0.25 and not job._cancel:
+                return
             total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
             done = d.get("downloaded_bytes") or 0
-            if total:
-                job["progress"] = float(done) / float(total) * 100.0
-            job["percent"] = f"{job.get('progress', 0.0):.1f}%"
-            job["speed"] = humanize_bps(d.get("speed"), d.get("_speed_str"))
-            job["eta"] = humanize_seconds(d.get("eta")) or strip_ansi(d.get("_eta_str"))
+            with job._lock:
+                job._lastHookTs = now
+                job.status = "running"
+                if total:
+                    job.progress = float(done) / float(total) * 100.0
+                job.percent = f"{job.progress:.1f}%"
+                job.speed = humanize_bps(d.get("speed"), d.get("_speed_str"))
+                job.eta = humanize_seconds(d.get("eta")) or strip_ansi(d.get("_eta_str"))
+            job.notify()
         elif status == "finished":
-            job["message"] = f"Processing {os.path.basename(d.get('filename',''))}…"
-        if job.get("_cancel"):
+            with job._lock:
+                job.message = f"Processing {os.path.basename(d.get('filename',''))}…"
+            job.notify()
+        if job._cancel:
             # Force-cancel; will be caught in worker
             raise KeyboardInterrupt("Canceled by user")
     return hook
 
-def _try_download_one(url: str, media_type: str, height: Optional[int], postprocessors, job_id: str, work_dir: str):
-    fmt = _format_string(media_type, height)
-    ydl_opts = _yt_opts({
-        "format": fmt,
-        "outtmpl": os.path.join(work_dir, "%(title)s.%(ext)s"),
-        "noprogress": False,
-        "progress_hooks": [_progress_hook(job_id)],
-    })
-    if postprocessors:
-        ydl_opts["postprocessors"] = postprocessors
+def _extract_title(u: str) -> tuple:
+    """Cheap flat extract just for the title (no format resolution)."""
     try:
-        with YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
+        with YoutubeDL(_yt_opts({"skip_download": True, "extract_flat": True})) as ydl:
+            info = ydl.extract_info(u, download=False)
+        return u, ((info or {}).get("title") or "")
+    except Exception:
+        return u, ""
+
+# ffmpeg re-encoding is CPU-bound; running it inside yt-dlp's postprocessor
+# would hog the thread that drives progress updates. Conversions go to a
+# small process pool instead (created on first audio job).
+_FFMPEG_POOL: Optional[ProcessPoolExecutor] = None
+_FFMPEG_POOL_LOCK = threading.Lock()
+
+def _ffmpeg_pool() -> ProcessPoolExecutor:
+    global _FFMPEG_POOL
+    with _FFMPEG_POOL_LOCK:
+        if _FFMPEG_POOL is None:
+            _FFMPEG_POOL = ProcessPoolExecutor(max_workers=(os.cpu_count() or 2) // 2 or 1)
+        return _FFMPEG_POOL
+
+def _convert_to_mp3(src: str, bitrate: Optional[str]) -> str:
+    """Runs in a pool process: re-encode src to mp3 and drop the original.
+    Returns the output path, or src unchanged if conversion fails."""
+    base, ext = os.path.splitext(src)
+    if ext.lower() == ".mp3":
+        return src
+    dst = base + ".mp3"
+    cmd = ["ffmpeg", "-y", "-i", src]
+    if bitrate and bitrate != "best":
+        cmd += ["-b:a", f"{bitrate}k"]
+    cmd.append(dst)
+    try:
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except Exception:
+        return src
+    try:
+        os.remove(src)
+    except OSError:
+        pass
+    return dst
+
+def _try_download_one(url: str, ydl: YoutubeDL, get_fallback_ydl):
+    """Download one URL on a shared instance, falling back to 'best' if the
+    requested format isn't available. `get_fallback_ydl` lazily builds (and
+    caches) the fallback instance so it's only constructed when needed."""
+    try:
+        ydl.download([url])
         return
     except DownloadError as e:
         if "Requested format is not available" not in str(e):
             raise
 
     # Fallback to Best
-    best_fmt = _format_string(media_type, None)
-    ydl_opts_fallback = _yt_opts({
-        "format": best_fmt,
-        "outtmpl": os.path.join(work_dir, "%(title)s.%(ext)s"),
-        "noprogress": False,
-        "progress_hooks": [_progress_hook(job_id)],
-    })
-    if postprocessors:
-        ydl_opts_fallback["postprocessors"] = postprocessors
-    with YoutubeDL(ydl_opts_fallback) as ydl:
-        ydl.download([url])
-
-def _unique_dst(dst_dir: str, filename: str) -> str:
+    get_fallback_ydl().download([url])
+
+def _unique_name(existing: set, filename: str) -> str:
+    """Pick a filename not in `existing` and reserve it in the set.
+    Pure in-memory check — no stat per candidate."""
+    if filename not in existing:
+        existing.add(filename)
+        return filename
     base, ext = os.path.splitext(filename)
-    candidate = os.path.join(dst_dir, filename)
     n = 1
-    while os.path.exists(candidate):
-        candidate = os.path.join(dst_dir, f"{base} ({n}){ext}")
+    while f"{base} ({n}){ext}" in existing:
         n += 1
-    return candidate
+    name = f"{base} ({n}){ext}"
+    existing.add(name)
+    return name
+
+def _unique_dst(dst_dir: str, filename: str) -> str:
+    """One-off wrapper that scans dst_dir itself; batch callers should build
+    the name set once and use _unique_name directly."""
+    with os.scandir(dst_dir) as it:
+        existing = {e.name for e in it}
+    return os.path.join(dst_dir, _unique_name(existing, filename))
+
+def _iter_files(dir_path: str):
+    """Yield file DirEntry objects under dir_path, depth-first via scandir."""
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_files(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
 
 def _move_completed_to_final(work_dir: str, final_dir: str):
     """
     Move finished files from work_dir → final_dir.
     Skips temporary parts (.part/.ytdl) and then removes the temp folder.
+    Uses os.replace (atomic rename) when both dirs are on the same device,
+    falling back to shutil.move only for cross-device moves.
     """
     if not work_dir or not final_dir:
         return
     if not os.path.isdir(work_dir):
         return
     os.makedirs(final_dir, exist_ok=True)
-    for root, _, files in os.walk(work_dir):
-        for f in files:
-            if f.endswith(".part") or f.endswith(".ytdl"):
-                continue
-            src = os.path.join(root, f)
-            dst = _unique_dst(final_dir, f)
-            os.makedirs(os.path.dirname(dst), exist_ok=True)
-            try:
-                shutil.move(src, dst)
-            except Exception:
-                shutil.copy2(src, dst)
-                try:
-                    os.remove(src)
-                except Exception:
-                    pass
+    try:
+        same_dev = os.stat(work_dir).st_dev == os.stat(final_dir).st_dev
+    except OSError:
+        same_dev = False
+    # One scandir up front instead of an os.path.exists syscall per candidate
+    with os.scandir(final_dir) as it:
+        existing = {e.name for e in it}
+    for entry in _iter_files(work_dir):
+        f = entry.name
+        if f.endswith(".part") or f.endswith(".ytdl"):
+            continue
+        src = entry.path
+        dst = os.path.join(final_dir, _unique_name(existing, f))
+        if same_dev:
+            os.replace(src, dst)
+            continue
+        try:
+            os.replace(src, dst)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.move(src, dst)
     # Clean entire temp tree (removes .part leftovers)
     shutil.rmtree(work_dir, ignore_errors=True)
 
@@ -300,44 +671,127 @@ def _download_urls(job_id: str, urls: List[str], media_type: str, height: Option
     job = JOBS[job_id]
     os.makedirs(work_dir, exist_ok=True)
 
-    postprocessors = None
+    # Build options once and reuse YoutubeDL instances: constructing one per
+    # item reparses extractors and tears down warm connection pools.
+    dl_base = {
+        "outtmpl": os.path.join(work_dir, "%(title)s.%(ext)s"),
+        "noprogress": False,
+        "progress_hooks": [_progress_hook(job_id)],
+    }
+
+    # Audio: yt-dlp's in-process FFmpegExtractAudio would re-encode on this
+    # thread; capture the downloaded path instead and convert in the pool.
+    convert_futs: List = []
     if media_type == "audio":
-        abitrate = job.get("audioBitrate")
-        pp = {"key": "FFmpegExtractAudio", "preferredcodec": "mp3"}
-        if abitrate and abitrate != "best":
-            pp["preferredquality"] = abitrate  # e.g., '192'
-        postprocessors = [pp]
+        abitrate = job.audioBitrate
+        def _queue_convert(filepath: str):
+            convert_futs.append(_ffmpeg_pool().submit(_convert_to_mp3, filepath, abitrate))
+        dl_base["post_hooks"] = [_queue_convert]
+    if _ARIA2C:
+        dl_base["external_downloader"] = "aria2c"
+        dl_base["external_downloader_args"] = {"aria2c": list(_ARIA2C_ARGS)}
+    ydl_opts = _yt_opts({**dl_base, "format": _format_string(media_type, height)})
+    fallback_opts = _yt_opts({**dl_base, "format": _format_string(media_type, None)})
 
     total = len(urls)
-    job["totalItems"] = total
-    for i, u in enumerate(urls, start=1):
-        job["currentItem"] = i
-        job["message"] = f"Downloading item {i}/{total}…"
-        try:
-            with YoutubeDL(_yt_opts({"skip_download": True})) as ydl:
-                vi = ydl.extract_info(u, download=False)
-            job["currentTitle"] = vi.get("title") or ""
-        except Exception:
-            job["currentTitle"] = ""
-        _try_download_one(u, media_type, height, postprocessors, job_id, work_dir)
-        if job.get("_cancel"):
-            break
+    with job._lock:
+        job.totalItems = total
+    job.notify()
+
+    # The probe result already carries every playlist entry's title — seed
+    # from it and fetch only whatever is missing, in parallel (extract_info
+    # is network-bound, so threads overlap the remaining round trips).
+    titles: Dict[str, str] = {}
+    for e in (job._probe or {}).get("entries") or []:
+        if e.get("url") and e.get("title"):
+            titles[e["url"]] = e["title"]
+    missing = [u for u in urls if u not in titles]
+    if missing:
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            for fut in as_completed([ex.submit(_extract_title, u) for u in missing]):
+                u, t = fut.result()
+                titles[u] = t
+
+    # Each pool thread keeps its own YoutubeDL (a single instance is not
+    # thread-safe), reused across the items that land on that thread.
+    tls = threading.local()
+    open_ydls: List[YoutubeDL] = []
+    open_lock = threading.Lock()
+
+    def _thread_ydl(attr: str, opts: Dict) -> YoutubeDL:
+        ydl = getattr(tls, attr, None)
+        if ydl is None:
+            ydl = YoutubeDL(opts)
+            setattr(tls, attr, ydl)
+            with open_lock:
+                open_ydls.append(ydl)
+        return ydl
+
+    started = {"n": 0}
+
+    def _one(u: str):
+        if job._cancel:
+            return
+        with job._lock:
+            started["n"] += 1
+            job.currentItem = started["n"]
+            job.message = f"Downloading item {started['n']}/{total}…"
+            job.currentTitle = titles.get(u, "")
+        job.notify()
+        _try_download_one(u, _thread_ydl("ydl", ydl_opts),
+                          lambda: _thread_ydl("fallback", fallback_opts))
+
+    workers = max(1, int(job.concurrency or 1))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            futs = [ex.submit(_one, u) for u in urls]
+            try:
+                for fut in as_completed(futs):
+                    fut.result()
+            except BaseException:
+                for f in futs:
+                    f.cancel()
+                raise
+    finally:
+        for ydl in open_ydls:
+            try:
+                ydl.close()
+            except Exception:
+                pass
+        # Conversions ride out in worker processes; wait (even on cancel or
+        # error) so files are final before the worker moves them out and
+        # removes the temp dir.
+        if convert_futs:
+            with job._lock:
+                job.message = "Converting to MP3…"
+            job.notify()
+            for fut in as_completed(convert_futs):
+                try:
+                    out = fut.result()
+                except Exception:
+                    continue
+                with job._lock:
+                    job.message = f"Converted {os.path.basename(out)}"
+                job.notify()
 
 def _download_worker(job_id: str):
     job = JOBS[job_id]
-    url = job["url"]
-    media_type = job["mediaType"]
-    height = job.get("videoHeight")
-    root_dir = job.get("rootDir", STORAGE_DIR)
+    url = job.url
+    media_type = job.mediaType
+    height = job.videoHeight
+    root_dir = job.rootDir or STORAGE_DIR
 
     final_dir = None
     work_dir = None
     try:
-        meta = probe_url_meta(url)
-        job["kind"] = meta["kind"]
-        job["title"] = meta["title"]
-        job["status"] = "running"
-        job["message"] = "Starting…"
+        # /api/probe usually ran moments ago; reuse its result if we have it
+        meta = job._probe or probe_url_meta(url)
+        with job._lock:
+            job.kind = meta["kind"]
+            job.title = meta["title"]
+            job.status = "running"
+            job.message = "Starting…"
+        job.notify()
 
         # Final destination in chosen bucket. Playlist gets a subfolder with playlist title.
         if meta["kind"] == "playlist":
@@ -345,36 +799,41 @@ def _download_worker(job_id: str):
         else:
             final_dir = root_dir
         os.makedirs(final_dir, exist_ok=True)
-        job["finalDir"] = final_dir
+        job.finalDir = final_dir
+        job.notify()
 
         # Work directory for temporary downloads
         work_dir = os.path.join(root_dir, "_tmp", job_id)
         os.makedirs(work_dir, exist_ok=True)
 
         # Choose URLs
-        selected_urls: List[str] = job.get("selectedUrls") or []
+        selected_urls: List[str] = job.selectedUrls or []
         urls = selected_urls if (meta["kind"] == "playlist" and selected_urls) else [url]
 
         _download_urls(job_id, urls, media_type, height, work_dir)
 
         # Normal completion
-        job["status"] = "done" if not job.get("_cancel") else "canceled"
-        job["message"] = "Completed" if job["status"] == "done" else "Canceled"
-        if job["status"] == "done":
-            job["progress"] = 100.0
-            job["percent"] = "100%"
-        job["eta"] = ""
-        job["speed"] = ""
+        with job._lock:
+            job.status = "done" if not job._cancel else "canceled"
+            job.message = "Completed" if job.status == "done" else "Canceled"
+            if job.status == "done":
+                job.progress = 100.0
+                job.percent = "100%"
+            job.eta = ""
+            job.speed = ""
     except KeyboardInterrupt:
         # Cancelled during an item — we'll still move finished files in finally
-        job["status"] = "canceled"
-        job["message"] = "Canceled"
+        with job._lock:
+            job.status = "canceled"
+            job.message = "Canceled"
     except DownloadError as e:
-        job["status"] = "error"
-        job["message"] = f"DownloadError: {e}"
+        with job._lock:
+            job.status = "error"
+            job.message = f"DownloadError: {e}"
     except Exception as e:
-        job["status"] = "error"
-        job["message"] = f"Error: {e}"
+        with job._lock:
+            job.status = "error"
+            job.message = f"Error: {e}"
     finally:
         # ALWAYS move any completed files (no .part) to the final destination
         try:
@@ -382,37 +841,27 @@ def _download_worker(job_id: str):
         except Exception:
             pass
         # If canceled, make it explicit that completed items were saved
-        if job.get("status") == "canceled":
-            job["message"] = "Canceled — completed items saved to destination."
+        if job.status == "canceled":
+            job.message = "Canceled — completed items saved to destination."
+        # Wake the SSE stream so the terminal state is pushed immediately
+        job.notify()
 
 def create_job(url: str, media_type: str, video_height: Optional[int],
                audio_bitrate: Optional[str], selected_urls: Optional[List[str]] = None,
-               output_dir: Optional[str] = None) -> str:
+               output_dir: Optional[str] = None, probe_meta: Optional[Dict] = None) -> str:
     job_id = uuid.uuid4().hex[:12]
     root_dir = _resolve_root_dir(output_dir, media_type)
-    JOBS[job_id] = {
-        "jobId": job_id,
-        "url": url,
-        "mediaType": media_type,              # 'video' | 'audio'
-        "videoHeight": video_height,          # int | None
-        "audioBitrate": audio_bitrate or "best",
-        "selectedUrls": list(selected_urls or []),
-        "rootDir": root_dir,                  # chosen bucket (Videos or Audios by default)
-        "finalDir": None,
-        "status": "queued",
-        "progress": 0.0,
-        "percent": "0%",
-        "eta": "",
-        "speed": "",
-        "message": "",
-        "_cancel": False,
-        "kind": None,
-        "title": "",
-        "currentItem": 0,
-        "totalItems": 0,
-        "currentTitle": "",
-        "created": int(time.time()),
-    }
+    JOBS[job_id] = Job(
+        jobId=job_id,
+        url=url,
+        mediaType=media_type,
+        videoHeight=video_height,
+        audioBitrate=audio_bitrate or "best",
+        selectedUrls=list(selected_urls or []),
+        rootDir=root_dir,
+        concurrency=int(os.environ.get("YTDL_CONCURRENCY", "2")),
+        _probe=probe_meta,
+    )
     t = threading.Thread(target=_download_worker, args=(job_id,), daemon=True)
     t.start()
     return job_id
@@ -421,9 +870,11 @@ def cancel_job(job_id: str) -> bool:
     job = JOBS.get(job_id)
     if not job:
         return False
-    job["_cancel"] = True
-    job["message"] = "Cancel requested…"
+    with job._lock:
+        job._cancel = True
+        job.message = "Cancel requested…"
+    job.notify()
     return True
 
-def get_job(job_id: str) -> Optional[Dict]:
+def get_job(job_id: str) -> Optional[Job]:
     return JOBS.get(job_id)